@@ -18,8 +18,8 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from .compat import byte2int
 from .exceptions import SIReaderException
+from .si_constants import CardType
 from .sireader import SIReader
 from .sireader_control import SIReaderControl
 from .sireader_readout import SIReaderReadout
@@ -29,5 +29,5 @@ __all__ = [
     "SIReaderControl",
     "SIReaderReadout",
     "SIReaderException",
-    "byte2int",
+    "CardType",
 ]
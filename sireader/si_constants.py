@@ -18,6 +18,56 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from enum import IntEnum
+from sys import intern
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+
+class CardType(IntEnum):
+    """Supported SI card types, also the index of their layout in SIConstants.CARD."""
+
+    SI5 = 0
+    SI6 = 1
+    SI8 = 2
+    SI9 = 3
+    pCard = 4
+    SI10 = 5
+
+    def __str__(self):
+        return self.name
+
+
+class CardLayout(NamedTuple):
+    """Offsets of the data fields in the memory of an SI card type.
+    See SIConstants.CARD for the layouts of the supported card types.
+    """
+
+    CN2: int  # card number byte 2
+    CN1: int  # card number byte 1
+    CN0: int  # card number byte 0
+    STD: Optional[int]  # start time day
+    SN: Optional[int]  # start number
+    ST: int  # start time
+    FTD: Optional[int]  # finish time day
+    FN: Optional[int]  # finish number
+    FT: int  # finish time
+    CTD: Optional[int]  # check time day
+    CHN: Optional[int]  # check number
+    CT: int  # check time
+    LTD: Optional[int]  # clear time day
+    LN: Optional[int]  # clear number
+    LT: Optional[int]  # clear time
+    RC: int  # punch counter
+    P1: int  # first punch
+    PL: int  # punch data length in bytes
+    PM: int  # punch maximum
+    CN: int  # control number offset in punch record
+    PTD: Optional[int]  # punchtime day byte offset in punch record
+    PTH: int  # punchtime high byte offset in punch record
+    PTL: int  # punchtime low byte offset in punch record
+    BC: Optional[int] = None  # number of blocks on card (SI8 and above)
+
 
 class SIConstants:
     """Constants with byte values needed to interact with SI stations.
@@ -206,57 +256,86 @@ class SIConstants:
     M_BC_START = 0x13  # SI Air+ / SIAC Beacon mode
     M_BC_FINISH = 0x14  # SI Air+ / SIAC Beacon mode
     M_BC_READOUT = 0x15  # SI Air+ / SIAC Beacon mode
-    SUPPORTED_MODES = (M_CONTROL, M_START, M_FINISH, M_READOUT, M_CLEAR, M_CHECK)
-    SUPPORTED_READ_BACKUP_MODES = (
-        M_CONTROL,
-        M_START,
-        M_FINISH,
-        M_CLEAR_OLD,
-        M_CLEAR,
-        M_CHECK,
+    SUPPORTED_MODES = frozenset(
+        (M_CONTROL, M_START, M_FINISH, M_READOUT, M_CLEAR, M_CHECK)
+    )
+    SUPPORTED_READ_BACKUP_MODES = frozenset(
+        (
+            M_CONTROL,
+            M_START,
+            M_FINISH,
+            M_CLEAR_OLD,
+            M_CLEAR,
+            M_CHECK,
+        )
+    )
+    # names are interned, comparing them against other interned strings
+    # is then an identity check
+    MODE2NAME = MappingProxyType(
+        {
+            k: intern(v)
+            for k, v in {
+                M_SIAC_SPECIAL: "SIAC special",
+                M_CONTROL: "Control",
+                M_START: "Start",
+                M_FINISH: "Finish",
+                M_READOUT: "Readout",
+                M_CLEAR_OLD: "Clear old",
+                M_CLEAR: "Clear",
+                M_CHECK: "Check",
+                M_PRINTOUT: "Printout",
+                M_START_TRIG: "Start trig",
+                M_FINISH_TRIG: "Finish trig",
+                M_BC_CONTROL: "BC control",
+                M_BC_START: "BC start",
+                M_BC_FINISH: "BC finish",
+                M_BC_READOUT: "BC readout",
+            }.items()
+        }
+    )
+    # MODE2NAME indexed by the mode byte, the modes are a dense range of small ints
+    _MODE_NAMES = tuple(map(MODE2NAME.get, range(M_BC_READOUT + 1)))
+    # mode names used by Sportident Config+ in backup CSV files
+    _BACKUP_CSV_MODES = MappingProxyType(
+        {
+            M_CONTROL: "Control",
+            M_START: "Start",
+            M_FINISH: "Finish",
+            M_CLEAR_OLD: "Clear",
+            M_CLEAR: "Clear",
+            M_CHECK: "Check",
+        }
     )
-    MODE2NAME = {
-        M_SIAC_SPECIAL: "SIAC special",
-        M_CONTROL: "Control",
-        M_START: "Start",
-        M_FINISH: "Finish",
-        M_READOUT: "Readout",
-        M_CLEAR_OLD: "Clear old",
-        M_CLEAR: "Clear",
-        M_CHECK: "Check",
-        M_PRINTOUT: "Printout",
-        M_START_TRIG: "Start trig",
-        M_FINISH_TRIG: "Finish trig",
-        M_BC_CONTROL: "BC control",
-        M_BC_START: "BC start",
-        M_BC_FINISH: "BC finish",
-        M_BC_READOUT: "BC readout",
-    }
 
-    MODEL2NAME = {
-        0x6F21: "SIMSRR1-AP",  # (ShortRangeRadio AccessPoint = SRR-dongle)
-        0x8003: "BSF3",  # BSF3 (serial numbers > 1.000)
-        0x8004: "BSF4",  # (serial numbers > 10.000)
-        0x8084: "BSM4-RS232",
-        0x8086: "BSM6-RS232/USB",
-        0x8115: "BSF5",  # (serial numbers > 50.000)
-        0x8117: "BSF7",  # (serial no. 70.000...70.521, 72.002...72.009)
-        0x8118: "BSF8",  # (serial no. 70.000...70.521, 72.002...72.009)
-        0x8146: "BSF6",  # (serial numbers > 30.000)
-        0x8187: "BS7-SI-Master",
-        0x8188: "BS8-SI-Master",
-        0x8197: "BSF7",  # (serial numbers > 71.000, apart from 72.002...72.009)
-        0x8198: "BSF8",  # (serial numbers > 80.000)
-        0x9197: "BSM7-RS232/USB",
-        0x9198: "BSM8-USB/SRR",
-        0x9199: "unknown",
-        0x9597: "BS7-S",  # (Sprinter)
-        0x9D9A: "BS11-BL",  # (SIAC / Air+)
-        0xB197: "BS7-P",  # (Printer)
-        0xB198: "BS8-P",  # (Printer)
-        0xB897: "BS7-GSM",
-        0xCD9B: "BS11-BS",  # -red / -blue (SIAC / Air+)
-    }
+    MODEL2NAME = MappingProxyType(
+        {
+            k: intern(v)
+            for k, v in {
+                0x6F21: "SIMSRR1-AP",  # (ShortRangeRadio AccessPoint = SRR-dongle)
+                0x8003: "BSF3",  # BSF3 (serial numbers > 1.000)
+                0x8004: "BSF4",  # (serial numbers > 10.000)
+                0x8084: "BSM4-RS232",
+                0x8086: "BSM6-RS232/USB",
+                0x8115: "BSF5",  # (serial numbers > 50.000)
+                0x8117: "BSF7",  # (serial no. 70.000...70.521, 72.002...72.009)
+                0x8118: "BSF8",  # (serial no. 70.000...70.521, 72.002...72.009)
+                0x8146: "BSF6",  # (serial numbers > 30.000)
+                0x8187: "BS7-SI-Master",
+                0x8188: "BS8-SI-Master",
+                0x8197: "BSF7",  # (serial numbers > 71.000, apart from 72.002...72.009)
+                0x8198: "BSF8",  # (serial numbers > 80.000)
+                0x9197: "BSM7-RS232/USB",
+                0x9198: "BSM8-USB/SRR",
+                0x9199: "unknown",
+                0x9597: "BS7-S",  # (Sprinter)
+                0x9D9A: "BS11-BL",  # (SIAC / Air+)
+                0xB197: "BS7-P",  # (Printer)
+                0xB198: "BS8-P",  # (Printer)
+                0xB897: "BS7-GSM",
+                0xCD9B: "BS11-BS",  # -red / -blue (SIAC / Air+)
+            }.items()
+        }
+    )
 
     # Weekday encoding (only for reference, currently unused)
     D_SUNDAY = 0b000
@@ -276,163 +355,169 @@ class SIConstants:
     # General card data structure values
     TIME_RESET = b"\xEE\xEE"
 
-    # SI Card data structures
-    CARD = {
-        "SI5": {
-            "CN2": 6,  # card number byte 2
-            "CN1": 4,  # card number byte 1
-            "CN0": 5,  # card number byte 0
-            "STD": None,  # start time day
-            "SN": None,  # start number
-            "ST": 19,  # start time
-            "FTD": None,  # finish time day
-            "FN": None,  # finish number
-            "FT": 21,  # finish time
-            "CTD": None,  # check time day
-            "CHN": None,  # check number
-            "CT": 25,  # check time
-            "LTD": None,  # clear time day
-            "LN": None,  # clear number
-            "LT": None,  # clear time
-            "RC": 23,  # punch counter
-            "P1": 32,  # first punch
-            "PL": 3,  # punch data length in bytes
-            "PM": 30,  # punch maximum (punches 31-36 have no time)
-            "CN": 0,  # control number offset in punch record
-            "PTD": None,  # punchtime day byte offset in punch record
-            "PTH": 1,  # punchtime high byte offset in punch record
-            "PTL": 2,  # punchtime low byte offset in punch record
-        },
-        "SI6": {
-            "CN2": 11,
-            "CN1": 12,
-            "CN0": 13,
-            "STD": 24,
-            "SN": 25,
-            "ST": 26,
-            "FTD": 20,
-            "FN": 21,
-            "FT": 22,
-            "CTD": 28,
-            "CHN": 29,
-            "CT": 30,
-            "LTD": 32,
-            "LN": 33,
-            "LT": 34,
-            "RC": 18,
-            "P1": 128,
-            "PL": 4,
-            "PM": 64,
-            "PTD": 0,  # Day of week byte, SI6 and newer
-            "CN": 1,
-            "PTH": 2,
-            "PTL": 3,
-        },
-        "SI8": {
-            "CN2": 25,
-            "CN1": 26,
-            "CN0": 27,
-            "STD": 12,
-            "SN": 13,
-            "ST": 14,
-            "FTD": 16,
-            "FN": 17,
-            "FT": 18,
-            "CTD": 8,
-            "CHN": 9,
-            "CT": 10,
-            "LTD": None,
-            "LN": None,
-            "LT": None,
-            "RC": 22,
-            "P1": 136,
-            "PL": 4,
-            "PM": 50,
-            "PTD": 0,
-            "CN": 1,
-            "PTH": 2,
-            "PTL": 3,
-            "BC": 2,  # number of blocks on card (only relevant for SI8 and above = those read with C_GET_SI9)
-        },
-        "SI9": {
-            "CN2": 25,
-            "CN1": 26,
-            "CN0": 27,
-            "STD": 12,
-            "SN": 13,
-            "ST": 14,
-            "FTD": 16,
-            "FN": 17,
-            "FT": 18,
-            "CTD": 8,
-            "CHN": 9,
-            "CT": 10,
-            "LTD": None,
-            "LN": None,
-            "LT": None,
-            "RC": 22,
-            "P1": 56,
-            "PL": 4,
-            "PM": 50,
-            "PTD": 0,
-            "CN": 1,
-            "PTH": 2,
-            "PTL": 3,
-            "BC": 2,
-        },
-        "pCard": {
-            "CN2": 25,  # Similar to SI9/10 but not identical
-            "CN1": 26,
-            "CN0": 27,
-            "STD": 12,
-            "SN": 13,
-            "ST": 14,
-            "FTD": 16,
-            "FN": 17,
-            "FT": 18,
-            "CTD": 8,
-            "CHN": 9,
-            "CT": 10,
-            "LTD": None,
-            "LN": None,
-            "LT": None,
-            "RC": 22,
-            "P1": 176,  # Location of Punch 1 I believe
-            "PL": 4,
-            "PM": 20,
-            "PTD": 0,
-            "CN": 1,
-            "PTH": 2,
-            "PTL": 3,
-            "BC": 2,
-        },
-        "SI10": {
-            "CN2": 25,  # Same data structure for SI11
-            "CN1": 26,
-            "CN0": 27,
-            "STD": 12,
-            "SN": 13,
-            "ST": 14,
-            "FTD": 16,
-            "FN": 17,
-            "FT": 18,
-            "CTD": 8,
-            "CHN": 9,
-            "CT": 10,
-            "LTD": None,
-            "LN": None,
-            "LT": None,
-            "RC": 22,
-            "P1": 128,  # would be 512 if all blocks were read, but blocks 1-3 are skipped on readout
-            "PL": 4,
-            "PM": 64,
-            "PTD": 0,
-            "CN": 1,
-            "PTH": 2,
-            "PTL": 3,
-            "BC": 8,
-        },
-    }
+    # SI Card data structures, indexed by CardType
+    CARD = (
+        # CardType.SI5
+        CardLayout(
+            CN2=6,  # card number byte 2
+            CN1=4,  # card number byte 1
+            CN0=5,  # card number byte 0
+            STD=None,  # start time day
+            SN=None,  # start number
+            ST=19,  # start time
+            FTD=None,  # finish time day
+            FN=None,  # finish number
+            FT=21,  # finish time
+            CTD=None,  # check time day
+            CHN=None,  # check number
+            CT=25,  # check time
+            LTD=None,  # clear time day
+            LN=None,  # clear number
+            LT=None,  # clear time
+            RC=23,  # punch counter
+            P1=32,  # first punch
+            PL=3,  # punch data length in bytes
+            PM=30,  # punch maximum (punches 31-36 have no time)
+            CN=0,  # control number offset in punch record
+            PTD=None,  # punchtime day byte offset in punch record
+            PTH=1,  # punchtime high byte offset in punch record
+            PTL=2,  # punchtime low byte offset in punch record
+        ),
+        # CardType.SI6
+        CardLayout(
+            CN2=11,
+            CN1=12,
+            CN0=13,
+            STD=24,
+            SN=25,
+            ST=26,
+            FTD=20,
+            FN=21,
+            FT=22,
+            CTD=28,
+            CHN=29,
+            CT=30,
+            LTD=32,
+            LN=33,
+            LT=34,
+            RC=18,
+            P1=128,
+            PL=4,
+            PM=64,
+            PTD=0,  # Day of week byte, SI6 and newer
+            CN=1,
+            PTH=2,
+            PTL=3,
+        ),
+        # CardType.SI8
+        CardLayout(
+            CN2=25,
+            CN1=26,
+            CN0=27,
+            STD=12,
+            SN=13,
+            ST=14,
+            FTD=16,
+            FN=17,
+            FT=18,
+            CTD=8,
+            CHN=9,
+            CT=10,
+            LTD=None,
+            LN=None,
+            LT=None,
+            RC=22,
+            P1=136,
+            PL=4,
+            PM=50,
+            PTD=0,
+            CN=1,
+            PTH=2,
+            PTL=3,
+            BC=2,  # number of blocks on card (only relevant for SI8 and above = those read with C_GET_SI9)
+        ),
+        # CardType.SI9
+        CardLayout(
+            CN2=25,
+            CN1=26,
+            CN0=27,
+            STD=12,
+            SN=13,
+            ST=14,
+            FTD=16,
+            FN=17,
+            FT=18,
+            CTD=8,
+            CHN=9,
+            CT=10,
+            LTD=None,
+            LN=None,
+            LT=None,
+            RC=22,
+            P1=56,
+            PL=4,
+            PM=50,
+            PTD=0,
+            CN=1,
+            PTH=2,
+            PTL=3,
+            BC=2,
+        ),
+        # CardType.pCard
+        CardLayout(
+            CN2=25,  # Similar to SI9/10 but not identical
+            CN1=26,
+            CN0=27,
+            STD=12,
+            SN=13,
+            ST=14,
+            FTD=16,
+            FN=17,
+            FT=18,
+            CTD=8,
+            CHN=9,
+            CT=10,
+            LTD=None,
+            LN=None,
+            LT=None,
+            RC=22,
+            P1=176,  # Location of Punch 1 I believe
+            PL=4,
+            PM=20,
+            PTD=0,
+            CN=1,
+            PTH=2,
+            PTL=3,
+            BC=2,
+        ),
+        # CardType.SI10
+        CardLayout(
+            CN2=25,  # Same data structure for SI11
+            CN1=26,
+            CN0=27,
+            STD=12,
+            SN=13,
+            ST=14,
+            FTD=16,
+            FN=17,
+            FT=18,
+            CTD=8,
+            CHN=9,
+            CT=10,
+            LTD=None,
+            LN=None,
+            LT=None,
+            RC=22,
+            P1=128,  # would be 512 if all blocks were read, but blocks 1-3 are skipped on readout
+            PL=4,
+            PM=64,
+            PTD=0,
+            CN=1,
+            PTH=2,
+            PTL=3,
+            BC=8,
+        ),
+    )
 
     # punch trigger in control mode data structure
     T_OFFSET = 8
@@ -47,21 +47,121 @@ Additions and modifications by Per Magnusson:
 from __future__ import print_function
 
 import csv
+import logging
+import logging.handlers
 import os
 import re
+import select
+import struct
 import sys
-import threading
 from binascii import hexlify
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Literal, Optional, Tuple
 
 import serial.tools.list_ports
 from serial import Serial
 from serial.serialutil import SerialException
 
-from .compat import PY3, byte2int, int2byte, iterbytes
 from .exceptions import SIReaderException, SIReaderTimeout
-from .si_constants import SIConstants
+from .si_constants import CardType, SIConstants
+
+
+def _crc16_table_entry(byte):
+    """Remainder of byte * x^16 modulo the SI CRC polynomial (MSB first)."""
+    crc = byte << 8
+    for _ in range(8):
+        if crc & SIConstants.CRC_BITF:
+            crc = ((crc << 1) ^ SIConstants.CRC_POLYNOM) & 0xFFFF
+        else:
+            crc = (crc << 1) & 0xFFFF
+    return crc
+
+
+_CRC16_TABLE = tuple(_crc16_table_entry(i) for i in range(256))
+# Same for byte * x^24, used for the high byte when shifting in 16 bit words
+_CRC16_TABLE_HI = tuple(
+    ((t << 8) & 0xFFFF) ^ _CRC16_TABLE[t >> 8] for t in _CRC16_TABLE
+)
+
+# serial port device names on Linux
+_TTY_USB_RE = re.compile("ttyUSB.*")
+_TTY_S_USB_RE = re.compile("ttyS.*|ttyUSB.*")
+# USB VID:PID of SportIdent stations (CP210x with the SportIdent product id)
+_SPORTIDENT_USB_IDS = frozenset({(0x10C4, 0x800A)})
+# matches pyserial's "VID:PID=10C4:800A" and WMI's "VID_10C4&PID_800A"
+_USB_ID_RE = re.compile(
+    r"VID[:_](?:PID=)?([0-9A-F]{4})[:&](?:PID_)?([0-9A-F]{4})", re.I
+)
+
+
+def _pyserial_comports():
+    """List the serial ports found by pyserial as (device, description, hwid) tuples."""
+    return [
+        (p.device, p.description, p.hwid) for p in serial.tools.list_ports.comports()
+    ]
+
+
+def _windows_comports():
+    """List the serial ports on Windows as (device, description, hwid) tuples.
+    Asks WMI only for the PnP entities with a COM port in their name if pywin32
+    is installed, instead of enumerating all devices like pyserial does.
+    Falls back to pyserial if the WMI query fails or finds no port, e.g. for
+    emulated ports without "(COM" in their name."""
+    try:
+        import win32com.client
+    except ImportError:
+        return _pyserial_comports()
+
+    ports = []
+    try:
+        entities = win32com.client.GetObject("winmgmts:").ExecQuery(
+            "SELECT Name, PNPDeviceID FROM Win32_PnPEntity WHERE Name LIKE '%(COM%'"
+        )
+        for entity in entities:
+            match = re.search(r"\((COM\d+)\)", entity.Name)
+            if match:
+                ports.append((match.group(1), entity.Name, entity.PNPDeviceID or ""))
+    except Exception:
+        # pywintypes.com_error if WMI is disabled, not accessible for the user
+        # or COM is not initialised in this thread
+        return _pyserial_comports()
+    return ports or _pyserial_comports()
+
+
+# read_backup: attempts at reading a block with a single request in flight
+# before giving up, and good replies after which the pipeline may grow again
+_BACKUP_READ_RETRIES = 3
+_BACKUP_WINDOW_REGROW = 16
+
+# number of logged frames collected before they are written to the logfile
+_LOG_BUFFER_FRAMES = 64
+
+
+def _file_logger(logfile):
+    """Return the logger writing the sent and received frames to logfile.
+    Readers logging to the same file share the logger and its handler, the file
+    is only opened when the first frame is logged. The frames are buffered and
+    written _LOG_BUFFER_FRAMES at a time, see SIReader.flush_log."""
+    logger = logging.getLogger("%s.%s" % (__name__, os.path.abspath(logfile)))
+    if not logger.handlers:
+        handler = logging.FileHandler(logfile, delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(
+            logging.handlers.MemoryHandler(_LOG_BUFFER_FRAMES, target=handler)
+        )
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+# Complete frames of commands sent with constant parameters, keyed on
+# (command, parameters, wakeup). Filled in below the SIReader class.
+_FIXED_FRAMES = {}
 
 
 class SIReader(SIConstants):
@@ -77,6 +177,7 @@ class SIReader(SIConstants):
         noconnect: bool = False,
         lowspeed: bool = False,
         logfile: Optional[str] = None,
+        low_latency: bool = True,
     ):
         """Initializes communication with SI station.
 
@@ -89,6 +190,9 @@ class SIReader(SIConstants):
             lowspeed (bool): Use low-speed mode. Defaults to False.
             logfile (Optional[str]): The path to the log file. If provided, the log will
                 be written to this file. Defaults to None.
+            low_latency (bool): Put the serial port into low latency mode on Linux,
+                so that replies are not held back in the USB serial driver.
+                Defaults to True.
 
         Raises:
             SIReaderException: If no SI Reader is found.
@@ -101,15 +205,16 @@ class SIReader(SIConstants):
         self.direct: bool = True  # Direct or remote mode
         self._noconnect: bool = noconnect
         self._lowspeed: bool = lowspeed
+        self._low_latency: bool = low_latency
 
-        # TODO: refactor logging to file
+        self._logger: Optional[logging.Logger] = None
         if logfile is not None:
-            self._logfile = open(logfile, "ab")
-        else:
-            self._logfile = None
+            self._logger = _file_logger(logfile)
         self.sysval: str = (
             ""  # The most recently read station configuration information
         )
+        # True if self.sysval may be outdated, see _SYSVAL_CHANGING_COMMANDS
+        self._sysval_dirty: bool = True
 
         errors = ""
         if port is not None:
@@ -145,11 +250,9 @@ class SIReader(SIConstants):
         """
         found: List[str] = []
         if sys.platform.startswith("linux"):
-            found = [
-                os.path.join("/dev", f)
-                for f in os.listdir("/dev")
-                if re.match("ttyS.*|ttyUSB.*" if ttyS else "ttyUSB.*", f)
-            ]
+            tty_re = _TTY_S_USB_RE if ttyS else _TTY_USB_RE
+            with os.scandir("/dev") as it:
+                found = [entry.path for entry in it if tty_re.match(entry.name)]
         elif sys.platform.startswith("darwin"):
             with os.scandir("/dev") as it:
                 for entry in it:
@@ -160,7 +263,7 @@ class SIReader(SIConstants):
             # Rank ports based on some kind of criteria of how
             # likely they are to be the correct port.
             portname = False
-            ports = list(serial.tools.list_ports.comports())
+            ports = _windows_comports()
             ranked_ports = []
             for p in ports:
                 portname = p[0]
@@ -174,10 +277,19 @@ class SIReader(SIConstants):
                     points += 10
                 if "acpi" in portname2.lower():
                     points -= 5
+                usb_id = _USB_ID_RE.search(portname2)
+                if usb_id and (
+                    (int(usb_id.group(1), 16), int(usb_id.group(2), 16))
+                    in _SPORTIDENT_USB_IDS
+                ):
+                    points += 50
                 ranked_ports.append([points, portname, portname1, portname2])
 
             # Sort on ranking
             ranked_ports.sort(key=lambda portinfo: -portinfo[0])
+            if ranked_ports and ranked_ports[0][0] >= 50:
+                # SportIdent USB ids found, no need to open all the other ports
+                return [portinfo[1] for portinfo in ranked_ports if portinfo[0] >= 50]
             # Try out the ports in the order they are ranked
             for portinfo in ranked_ports:
                 try:
@@ -191,35 +303,59 @@ class SIReader(SIConstants):
         return found
 
     @classmethod
-    def scan_stations(cls, lowspeed: bool = False) -> List[Tuple[str, int]]:
+    def scan_stations(
+        cls, lowspeed: bool = False, timeout: float = 5
+    ) -> List[Tuple[str, int]]:
         """Scans all the possible serial ports and tries to find a SportIdent station.
 
         Args:
             lowspeed (bool, optional): Flag indicating whether to use low-speed mode. Defaults to False.
+            timeout (float, optional): Seconds to wait for all ports to answer, ports still busy after that are given up. Defaults to 5.
 
         Returns:
             list: A list of tuples containing the found serial ports and their corresponding station codes.
         """
 
-        found = []
-
         def _run(port: str):
             si = cls(port=port, debug=True, lowspeed=lowspeed)
             stationCode = si.get_station_code()
-            found.append((port, stationCode))
             si.disconnect()
+            return (port, stationCode)
 
-        threads = []
-        # Search in parallel
-        for port in cls.guess_serial_ports():
-            # TODO: don't use threading, use asyncio
-            t = threading.Thread(target=_run, args=(port,))
-            threads.append(t)
-            t.start()
-        for t in threads:
-            t.join()
+        found = []
+        ports = cls.guess_serial_ports()
+        # Search in parallel, all ports at once so that ports that don't answer
+        # can't hold back the others past the timeout
+        executor = ThreadPoolExecutor(max_workers=max(len(ports), 1))
+        futures = [executor.submit(_run, port) for port in ports]
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                try:
+                    found.append(future.result())
+                except Exception:
+                    # skip ports that fail in any way, e.g. SerialException or
+                    # OSError when opening them
+                    pass
+        except FuturesTimeoutError:
+            pass
+        finally:
+            # don't start the probes still queued and don't wait for ports that hang
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
         return found
 
+    def _drain_input(self, quiet=0.1):
+        """Discard the input from the station until it stays quiet for
+        'quiet' seconds."""
+        old_timeout = self._serial.timeout
+        self._serial.timeout = quiet
+        try:
+            while self._serial.read(4096):
+                pass
+        finally:
+            self._serial.timeout = old_timeout
+
     def flush(self):
         """
         Flushes the input and output buffers of the serial connection.
@@ -265,7 +401,7 @@ class SIReader(SIConstants):
         if not mode in SIReader.SUPPORTED_MODES:
             raise SIReaderException("Unsupported mode '%i'!" % mode)
         try:
-            self._send_command(SIReader.C_SET_SYS_VAL, SIReader.O_MODE + int2byte(mode))
+            self._send_command(SIReader.C_SET_SYS_VAL, SIReader.O_MODE + bytes((mode,)))
         finally:
             self._update_proto_config()
 
@@ -283,9 +419,9 @@ class SIReader(SIConstants):
                 "Invalid control code: '%i'! Supported code range: 1-1023." % code
             )
         # lower byte of control code
-        code_low = int2byte(code & 0xFF)
+        code_low = bytes((code & 0xFF,))
         # high byte of control code, only the first 2 bits are used, the rest are set to 1
-        code_high = int2byte((code >> 2) | 0b00111111)
+        code_high = bytes(((code >> 2) | 0b00111111,))
         try:
             self._send_command(
                 SIReader.C_SET_SYS_VAL, SIReader.O_STATION_CODE + code_low + code_high
@@ -316,11 +452,34 @@ class SIReader(SIConstants):
         """Set the baudrate to 38400"""
         self.set_baud_rate(38400)
 
+    # Commands after which the stored SYS_VAL reading is outdated: they change
+    # SYS_VAL, switch to another station (direct/remote) or change the backup
+    # memory pointers or the station's state otherwise
+    _SYSVAL_CHANGING_COMMANDS = frozenset(
+        (
+            SIConstants.C_SET_SYS_VAL,
+            SIConstants.C_SET_MS,
+            SIConstants.C_ERASE_BACKUP,
+            SIConstants.C_SET_TIME,
+            SIConstants.C_SET_BAUD,
+            SIConstants.C_OFF,
+        )
+    )
+
     def refresh_sysval(self):
         """Read the entire station configuration information (SYS_VAL) and store in the object
         so that the sysval_ functions can return good information.
         """
         self.sysval = self._send_command(SIReader.C_GET_SYS_VAL, b"\x00\x80")[1]
+        self._sysval_dirty = False
+
+    def _get_sysval(self):
+        """Return the most recent reading of SYS_VAL, read it again if it is outdated.
+        Like in _extract_sysval, 1 has to be added to the O_... offsets to index it.
+        """
+        if self._sysval_dirty or len(self.sysval) < 0x80:
+            self.refresh_sysval()
+        return self.sysval
 
     def save_sys_val(self, filename=None):
         """Save the station configuration data (SYS_VAL) to a CSV file.
@@ -330,8 +489,7 @@ class SIReader(SIConstants):
         @param filename: optional name of CSV file
         @return:         The name of the CSV file
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         code = self.sysval_code()
         datestr = datetime.now().strftime("%Y-%m-%d_%H.%M.%S")
         if filename is None:
@@ -342,41 +500,32 @@ class SIReader(SIConstants):
             )
             header = ["Offset", "Value"]
             csvwriter.writerow(header)
-            offs = 0
-            for byte in self.sysval[1:]:
-                csvwriter.writerow([offs, byte])
-                offs += 1
-            return filename
-        return ""
+            csvwriter.writerows(enumerate(sysval[1:]))
+        return filename
 
     def sysval_serno(self):
         """Return the station serial number from the most recent reading of SYS_VAL.
         @return : station serial number as an integer
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         return SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_SERIAL_NO, 4)
+            SIReader._extract_sysval(sysval, SIReader.O_SERIAL_NO, 4)
         )
 
     def sysval_fwver(self):
         """Return the station firmware version from the most recent reading of SYS_VAL.
         @return : firmware station serial number as a 3-character string
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        return SIReader._extract_sysval(self.sysval, SIReader.O_FIRMWARE, 3).decode(
-            "ascii"
-        )
+        sysval = self._get_sysval()
+        return SIReader._extract_sysval(sysval, SIReader.O_FIRMWARE, 3).decode("ascii")
 
     def sysval_model_id(self):
         """Return the station model id from the most recent reading of SYS_VAL.
         @return : model id, an integer
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         return SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_MODEL_ID, 2)
+            SIReader._extract_sysval(sysval, SIReader.O_MODEL_ID, 2)
         )
 
     def sysval_model_str(self):
@@ -388,49 +537,41 @@ class SIReader(SIConstants):
         return (
             SIReader.MODEL2NAME[model_id]
             if model_id_recognized
-            else "0x%04x" % model_id
+            else f"0x{model_id:04x}"
         )
 
     def sysval_build_date(self):
         """Return the station build date from the most recent reading of SYS_VAL.
         @return : build-date as a string YYYY-MM-DD
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        date_str = SIReader._extract_sysval(self.sysval, SIReader.O_BUILD_DATE, 3)
-        date_str = "20%02d-%02d-%02d" % (date_str[0], date_str[1], date_str[2])
+        sysval = self._get_sysval()
+        date_str = SIReader._extract_sysval(sysval, SIReader.O_BUILD_DATE, 3)
+        date_str = f"20{date_str[0]:02d}-{date_str[1]:02d}-{date_str[2]:02d}"
         return date_str
 
     def sysval_battery_date(self):
         """Return the station battery date from the most recent reading of SYS_VAL.
         @return : build-date as a string YYYY-MM-DD
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        date_str = SIReader._extract_sysval(self.sysval, SIReader.O_BAT_DATE, 3)
-        date_str = "20%02d-%02d-%02d" % (date_str[0], date_str[1], date_str[2])
+        sysval = self._get_sysval()
+        date_str = SIReader._extract_sysval(sysval, SIReader.O_BAT_DATE, 3)
+        date_str = f"20{date_str[0]:02d}-{date_str[1]:02d}-{date_str[2]:02d}"
         return date_str
 
     def sysval_mem_size(self):
         """Return the station's memory size from the most recent reading of SYS_VAL.
         @return : station's memory size in kB
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        return SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_MEM_SIZE, 1)
-        )
+        sysval = self._get_sysval()
+        return sysval[SIReader.O_MEM_SIZE[0] + 1]
 
     def sysval_volt(self):
         """Return the station voltage from the most recent reading of SYS_VAL.
         @return : voltage, a float, V
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         return (
-            SIReader._to_int(
-                SIReader._extract_sysval(self.sysval, SIReader.O_BAT_VOLT, 2)
-            )
+            SIReader._to_int(SIReader._extract_sysval(sysval, SIReader.O_BAT_VOLT, 2))
             * 5.0
         ) / 65536.0
 
@@ -438,12 +579,9 @@ class SIReader(SIConstants):
         """Return the station's battery capacity from the most recent reading of SYS_VAL.
         @return : capacity, a float, mAh
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         return (
-            SIReader._to_int(
-                SIReader._extract_sysval(self.sysval, SIReader.O_BAT_CAP, 2)
-            )
+            SIReader._to_int(SIReader._extract_sysval(sysval, SIReader.O_BAT_CAP, 2))
             * 16.0
         ) / 225.0
 
@@ -451,11 +589,10 @@ class SIReader(SIConstants):
         """Return the station's used battery capacity from the most recent reading of SYS_VAL.
         @return : used capacity, a float, %
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         return (
             SIReader._to_int(
-                SIReader._extract_sysval(self.sysval, SIReader.O_USED_BAT_CAP, 3)
+                SIReader._extract_sysval(sysval, SIReader.O_USED_BAT_CAP, 3)
             )
             * 2.778e-5
         )
@@ -464,53 +601,35 @@ class SIReader(SIConstants):
         """Return the station operating mode from the most recent reading of SYS_VAL.
         @return : mode, a string
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        mode = SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_MODE, 1)
-        )
-        if mode in SIReader.MODE2NAME:
-            mode_str = SIReader.MODE2NAME[mode]
-        else:
-            mode_str = "0x%02x" % mode
-        return mode_str
+        sysval = self._get_sysval()
+        mode = sysval[SIReader.O_MODE[0] + 1]
+        return SIReader._mode_name(mode)
 
     def sysval_code(self):
         """Return the station code from the most recent reading of SYS_VAL.
         @return : code, 1-1023
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        code_low = SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_STATION_CODE, 1)
-        )
+        sysval = self._get_sysval()
+        code_low = sysval[SIReader.O_STATION_CODE[0] + 1]
         # Also contains high bits of code
-        feedback = SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_FEEDBACK, 1)
-        )
-        self._station_code = code_low + ((feedback & 0b11000000) << 2)
+        feedback = sysval[SIReader.O_FEEDBACK[0] + 1]
+        self._station_code = code_low | ((feedback & 0b11000000) << 2)
         return self._station_code
 
     def sysval_feedback(self):
         """Return the station feedback byte from the most recent reading of SYS_VAL.
         @return : feedback, an integer, 0-255
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        return SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_FEEDBACK, 1)
-        )
+        sysval = self._get_sysval()
+        return sysval[SIReader.O_FEEDBACK[0] + 1]
 
     def sysval_192_punches(self):
         """Return the station's setting regarding 192 punches for SI card 6
         from the most recent reading of SYS_VAL.
         @return : True if it is set, False if not, a byte is the value is unexpected
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        si6_192 = SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_SI6_CB, 1)
-        )
+        sysval = self._get_sysval()
+        si6_192 = sysval[SIReader.O_SI6_CB[0] + 1]
         if si6_192 == 0 or si6_192 == 0xC1:
             return False
         if si6_192 == 0x08 or si6_192 == 0xFF:
@@ -521,20 +640,16 @@ class SIReader(SIConstants):
         """Return the station protocol byte from the most recent reading of SYS_VAL.
         @return : protocol, an integer, 0-255
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        return SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_PROTO, 1)
-        )
+        sysval = self._get_sysval()
+        return sysval[SIReader.O_PROTO[0] + 1]
 
     def sysval_active_time(self):
         """Return the station active time from the most recent reading of SYS_VAL.
         @return : active time, an integer 0-5759 minutes
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
+        sysval = self._get_sysval()
         return SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_ACTIVE_TIME, 2)
+            SIReader._extract_sysval(sysval, SIReader.O_ACTIVE_TIME, 2)
         )
 
     def set_feedback(self, audible=True, optical=True):
@@ -543,11 +658,8 @@ class SIReader(SIConstants):
         @param audible : Boolean (optional, default True)
         @param optical : Boolean (optional, default True)
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        feedback = SIReader._to_int(
-            SIReader._extract_sysval(self.sysval, SIReader.O_FEEDBACK, 1)
-        )
+        sysval = self._get_sysval()
+        feedback = sysval[SIReader.O_FEEDBACK[0] + 1]
         if optical:
             feedback |= 0b00000001
         else:
@@ -556,27 +668,35 @@ class SIReader(SIConstants):
             feedback |= 0b00000100
         else:
             feedback &= ~0b00000100
-        self._send_command(
-            SIReader.C_SET_SYS_VAL, SIReader.O_FEEDBACK + int2byte(feedback)
-        )
+        self.update_sysval({SIReader.O_FEEDBACK: bytes((feedback,))})
 
     def set_active_time(self, time):
         """Set the active time.
         @param time : minutes, 0-5759
         """
-        if len(self.sysval) < 0x80:
-            self.refresh_sysval()
-        time_barr = SIReader._to_str(time, 2)
-        self._send_command(SIReader.C_SET_SYS_VAL, SIReader.O_ACTIVE_TIME + time_barr)
+        self.update_sysval({SIReader.O_ACTIVE_TIME: SIReader._to_str(time, 2)})
 
     def set_si6_192(self, enable=False):
         """Set whether the station shall support SI card 6 with 192 punches.
         @param enable : Boolean, default is False
         """
-        if enable:
-            self._send_command(SIReader.C_SET_SYS_VAL, SIReader.O_SI6_CB + b"\xFF")
-        else:
-            self._send_command(SIReader.C_SET_SYS_VAL, SIReader.O_SI6_CB + b"\xC1")
+        self.update_sysval({SIReader.O_SI6_CB: b"\xFF" if enable else b"\xC1"})
+
+    def update_sysval(self, values):
+        """Write several SYS_VAL fields with as few commands as possible.
+        Fields that are adjacent in SYS_VAL are written with a single
+        C_SET_SYS_VAL command.
+        @param values : dict mapping the offsets (SIReader.O_... constants) to
+                        the bytes to write there
+        """
+        groups = []
+        for offset, data in sorted(values.items()):
+            if groups and groups[-1][0] + len(groups[-1][1]) == offset[0]:
+                groups[-1][1].extend(data)
+            else:
+                groups.append((offset[0], bytearray(data)))
+        for start, data in groups:
+            self._send_command(SIReader.C_SET_SYS_VAL, bytes((start,)) + data)
 
     def get_station_code(self):
         """Get si station control code.
@@ -589,16 +709,16 @@ class SIReader(SIConstants):
         @return: datetime
         """
         bintime = self._send_command(SIReader.C_GET_TIME, b"")[1]
-        year = byte2int(bintime[0]) + 2000
-        month = byte2int(bintime[1])
-        day = byte2int(bintime[2])
-        am_pm = byte2int(bintime[3]) & 0b1
+        year = bintime[0] + 2000
+        month = bintime[1]
+        day = bintime[2]
+        am_pm = bintime[3] & 0b1
         second = SIReader._to_int(bintime[4:6])
         hour = am_pm * 12 + second // 3600
         second %= 3600
         minute = second // 60
         second %= 60
-        ms = int(round(byte2int(bintime[6]) / 256.0 * 1000000))
+        ms = int(round(bintime[6] / 256.0 * 1000000))
         try:
             return datetime(year, month, day, hour, minute, second, ms)
         except ValueError:
@@ -627,7 +747,7 @@ class SIReader(SIConstants):
         inserted into the station.
         @param count: Count of beeps
         """
-        self._send_command(SIReader.C_BEEP, int2byte(count))
+        self._send_command(SIReader.C_BEEP, bytes((count,)))
 
     def set_direct(self):
         """Set the station to direct (master) mode."""
@@ -639,7 +759,7 @@ class SIReader(SIConstants):
         self._send_command(SIReader.C_SET_MS, SIReader.P_MS_INDIRECT)
         self.direct = False
 
-    def read_backup(self, progress=0):
+    def read_backup(self, progress=0, window=1):
         """Read out the entire backup memory of a station configured as
         control, check, clear, start or finish.
         Before calling this function: set the station in direct or remote mode
@@ -648,6 +768,9 @@ class SIReader(SIConstants):
         The remote station can be in either extended or legacy mode.
         @param progress: Set this to 1 to have the function print out
                          progress indications.
+        @param window:   Maximum number of read requests sent to the station
+                         before waiting for their replies. It is lowered for a
+                         while after lost replies.
         @return:         A list of tuples:  (date, cardnr, error)
                          'date' is a datetime object with the punch time
                          'cardnr' is an int with the card number
@@ -663,45 +786,92 @@ class SIReader(SIConstants):
         if not self.proto_config["mode"] in SIReader.SUPPORTED_READ_BACKUP_MODES:
             raise SIReaderException(
                 "Station is in unsupported mode: %s"
-                % SIReader.MODE2NAME[self.proto_config["mode"]]
+                % SIReader._mode_name(self.proto_config["mode"])
             )
 
         # Read out backup memory pointers
         ret = self._send_command(SIReader.C_GET_SYS_VAL, b"\x00\x80")[1]
 
-        offs1 = byte2int(SIReader.O_BACKUP_PTR_HI) + 1
-        offs2 = byte2int(SIReader.O_BACKUP_PTR_LO) + 1
+        offs1 = SIReader.O_BACKUP_PTR_HI[0] + 1
+        offs2 = SIReader.O_BACKUP_PTR_LO[0] + 1
         end_ptr = SIReader._to_int(ret[offs1 : offs1 + 2] + ret[offs2 : offs2 + 2])
 
+        if self.proto_config["ext_proto"]:
+            # Extended protocol
+            first = SIReader.BUX_FIRST + 1
+            step = SIReader.BUX_SIZE
+        else:
+            # Legacy protocol
+            first = SIReader.BUL_FIRST + 1
+            step = SIReader.BUL_SIZE
+
         # Read out entire used backup memory.
         # It seems like we can only read out 0x80 bytes at a time, so we might need
-        # to divide the read into several commands.
-        bakmem = b""
+        # to divide the read into several commands. Several of them are sent
+        # before reading the replies, so the station can answer back-to-back.
+        # The number of requests in flight starts at 1 and grows up to 'window'
+        # while the station keeps up, it is halved if a reply is lost and may
+        # grow again after a run of good replies. A block that fails with a
+        # single request in flight is retried _BACKUP_READ_RETRIES times.
+        bakmem = bytearray()
+        pending = deque()  # addresses of the requests not answered yet
+        in_flight = 1
+        limit = window  # current maximum of in_flight, lowered after errors
+        failures = 0  # failed attempts at depth 1 since the last good reply
+        successes = 0  # good replies since the last error
         read_ptr = 0x100  # This is where reading always seems to start
-        while read_ptr < end_ptr:
-            read_ptr_bytes = (
-                int2byte(read_ptr >> 16)
-                + int2byte((read_ptr >> 8) & 0xFF)
-                + int2byte(read_ptr & 0xFF)
-            )
-            byte_cnt = b"\x80"
-            if end_ptr - read_ptr < 0x80:
-                byte_cnt = int2byte(end_ptr - read_ptr)
-            ret = self._send_command(SIReader.C_GET_BACKUP, read_ptr_bytes + byte_cnt)[
-                1
-            ]
+        while read_ptr < end_ptr or pending:
+            while read_ptr < end_ptr and len(pending) < in_flight:
+                byte_cnt = min(end_ptr - read_ptr, 0x80)
+                # 3 byte address followed by the byte count, packed as one integer
+                params = ((read_ptr << 8) | byte_cnt).to_bytes(4, "big")
+                self._write_command(
+                    SIReader.C_GET_BACKUP, params, check_empty=not pending
+                )
+                pending.append(read_ptr)
+                read_ptr += byte_cnt
+            try:
+                ret = self._read_command()[1]
+                # the reply starts with the address of the data
+                address = int.from_bytes(ret[:3], "big")
+                if address < pending[0]:
+                    # late reply to a request sent again after an error
+                    continue
+                if address != pending[0]:
+                    raise SIReaderException(
+                        "Backup memory reply for unexpected address"
+                    )
+            except (SIReaderException, SIReaderTimeout):
+                if in_flight == 1:
+                    failures += 1
+                    if failures > _BACKUP_READ_RETRIES:
+                        raise
+                # The station lost a request, halve the depth and request
+                # everything not answered yet again. The replies to the other
+                # requests still on the way are dropped first, so they are not
+                # taken for the new ones.
+                limit = in_flight = max(in_flight // 2, 1)
+                successes = 0
+                read_ptr = pending[0]
+                pending.clear()
+                self._drain_input()
+                self._serial.flushOutput()
+                continue
+            pending.popleft()
+            failures = 0
+            successes += 1
+            if limit < window and successes >= _BACKUP_WINDOW_REGROW:
+                # the station keeps up again, allow one more request in flight
+                limit += 1
+                successes = 0
+            if in_flight < limit:
+                in_flight += 1
             if progress > 0:
                 print(".", end="")
                 sys.stdout.flush()
-            if self.proto_config["ext_proto"]:
-                # Extended protocol
-                bakmem += ret[SIReader.BUX_FIRST + 1 :]
-                step = SIReader.BUX_SIZE
-            else:
-                # Legacy protocol
-                bakmem += ret[SIReader.BUL_FIRST + 1 :]
-                step = SIReader.BUL_SIZE
-            read_ptr += byte2int(byte_cnt)
+            bakmem += ret[first:]
+        bakmem = bytes(bakmem)
+        self.flush_log()
 
         # Gather some time-information to help guessing what dates
         # punches from the basic protocol belongs to.
@@ -713,34 +883,37 @@ class SIReader(SIConstants):
         ).total_seconds()
         # Loop over punch data
         res = []
-        ii = 0
-        while ii < len(bakmem):
-            punch = bakmem[ii : ii + step]
-            err = ""
-            secs = 0
-            us = 0
-            if self.proto_config["ext_proto"]:
-                # Extended protocol
-                cardnr_bytes = b"\x00" + punch[SIReader.BUX_CN : SIReader.BUX_CN + 3]
-                cardnr = SIReader._decode_cardnr(cardnr_bytes)
-                year = 2000 + (punch[SIReader.BUX_YM] >> 2)
-                month = ((punch[SIReader.BUX_YM] & 0x3) << 2) + (
-                    punch[SIReader.BUX_MDAP] >> 6
-                )
-                day = (punch[SIReader.BUX_MDAP] & 0x3F) >> 1
-                ampm = punch[SIReader.BUX_MDAP] & 0x01
-                if byte2int(punch[SIReader.BUX_SECS]) >= 0xF0:
+        if self.proto_config["ext_proto"]:
+            # Extended protocol, the records are decoded field by field with
+            # strided slices instead of slicing out every record first
+            cardnrs = [
+                bakmem[i : i + 3]
+                for i in range(SIReader.BUX_CN, len(bakmem) - step + 1, step)
+            ]
+            records = zip(
+                cardnrs,
+                bakmem[SIReader.BUX_YM :: step],
+                bakmem[SIReader.BUX_MDAP :: step],
+                bakmem[SIReader.BUX_SECS :: step],
+                bakmem[SIReader.BUX_SECS + 1 :: step],
+                bakmem[SIReader.BUX_MS :: step],
+            )
+            day_starts = {}
+            for cn, ym, mdap, secs_hi, secs_lo, ms in records:
+                err = ""
+                secs = 0
+                us = 0
+                cardnr = SIReader._decode_cardnr(b"\x00" + cn)
+                year = 2000 + (ym >> 2)
+                month = ((ym & 0x3) << 2) + (mdap >> 6)
+                day = (mdap & 0x3F) >> 1
+                ampm = mdap & 0x01
+                if secs_hi >= 0xF0:
                     # Error code
-                    err = "Err%X" % byte2int(punch[SIReader.BUX_SECS] & 0xF)
+                    err = "Err%X" % (secs_hi & 0xF)
                 else:
-                    secs = SIReader._to_int(
-                        punch[SIReader.BUX_SECS : SIReader.BUX_SECS + 2]
-                    )
-                    us = (
-                        1e6
-                        * SIReader._to_int(punch[SIReader.BUX_MS : SIReader.BUX_MS + 1])
-                        / 256
-                    )
+                    secs = (secs_hi << 8) | secs_lo
+                    us = 1e6 * ms / 256
                 if month == 0:
                     # This is weird, but happened during testing. Corrupted memory?
                     month += 12
@@ -752,47 +925,58 @@ class SIReader(SIConstants):
                     year += 1
                     err += "ErrDate"
                 secs += 12 * 3600 * ampm
-                punch_datetime = datetime(year, month, day) + timedelta(
-                    seconds=secs, microseconds=us
-                )
+                # most punches share their day with the previous ones
+                date = (year, month, day)
+                day_start = day_starts.get(date)
+                if day_start is None:
+                    day_start = day_starts[date] = datetime(year, month, day)
+                punch_datetime = day_start + timedelta(0, secs, us)
+                res.append((punch_datetime, cardnr, err))
+            if progress > 0:
+                print("")
+            return res
+
+        # Legacy protocol
+        ii = 0
+        while ii < len(bakmem):
+            punch = bakmem[ii : ii + step]
+            err = ""
+            secs = 0
+            cardnr_bytes = (
+                b"\x00"
+                + punch[SIReader.BUL_CNS : SIReader.BUL_CNS + 1]
+                + punch[SIReader.BUL_CN : SIReader.BUL_CN + 2]
+            )
+            cardnr = SIReader._decode_cardnr(cardnr_bytes)
+            # Monday = 0 etc
+            weekday = (((punch[SIReader.BUL_PTD] & 0x0E) >> 1) - 1) % 7
+            ampm = punch[SIReader.BUL_PTD] & 0x01
+            if punch[SIReader.BUL_SECS] >= 0xF0:
+                # Error code
+                err = "Err%X" % (punch[SIReader.BUL_SECS] & 0xF)
             else:
-                # Legacy protocol
-                cardnr_bytes = (
-                    "\x00"
-                    + punch[SIReader.BUL_CNS : SIReader.BUL_CNS + 1]
-                    + punch[SIReader.BUL_CN : SIReader.BUL_CN + 2]
+                secs = int.from_bytes(
+                    punch[SIReader.BUL_SECS : SIReader.BUL_SECS + 2], "big"
                 )
-                cardnr = SIReader._decode_cardnr(cardnr_bytes)
-                weekday = (
-                    (punch[SIReader.BUL_PTD] & 0x0E) >> 1 - 1
-                ) % 7  # Monday = 0 etc
-                ampm = punch[SIReader.BUL_PTD] & 0x01
-                if byte2int(punch[SIReader.BUL_SECS]) >= 0xF0:
-                    # Error code
-                    err = "Err%X" % byte2int(punch[SIReader.BUL_SECS] & 0xF)
-                else:
-                    secs = SIReader._to_int(
-                        punch[SIReader.BUL_SECS : SIReader.BUL_SECS + 2]
-                    )
-                secs += 12 * 3600 * ampm
-                # In legacy protocol, we really only know what weekday the punch took place,
-                # but in order to be able to return a convenient datetime, we assume it took
-                # place within the last seven days and provide a full datetime
-                # based on this assumption.
-                if (
-                    weekday * 24 * 3600 + secs
-                    < now_weekday * 24 * 3600 + secs_since_midnight + 3600
-                ):
-                    # Punch probably took place earlier this week.
-                    # The added 3600 seconds above is to handle the case if the computer
-                    # and station are not in sync.
-                    day_offset = now_weekday - weekday
-                else:
-                    # Punch probably took place last week
-                    day_offset = now_weekday - weekday + 7
-                punch_datetime = now_datetime.replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                ) + timedelta(seconds=secs, days=day_offset)
+            secs += 12 * 3600 * ampm
+            # In legacy protocol, we really only know what weekday the punch took place,
+            # but in order to be able to return a convenient datetime, we assume it took
+            # place within the last seven days and provide a full datetime
+            # based on this assumption.
+            if (
+                weekday * 24 * 3600 + secs
+                < now_weekday * 24 * 3600 + secs_since_midnight + 3600
+            ):
+                # Punch probably took place earlier this week.
+                # The added 3600 seconds above is to handle the case if the computer
+                # and station are not in sync.
+                day_offset = now_weekday - weekday
+            else:
+                # Punch probably took place last week
+                day_offset = now_weekday - weekday + 7
+            punch_datetime = now_datetime.replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ) + timedelta(seconds=secs, days=-day_offset)
             res.append((punch_datetime, cardnr, err))
             ii += step
         if progress > 0:
@@ -826,24 +1010,12 @@ class SIReader(SIConstants):
         if serno == 0:
             serno = self._serno
         if mode == "":
-            if self.proto_config["mode"] == SIReader.M_CONTROL:
-                mode = "Control"
-            elif self.proto_config["mode"] == SIReader.M_START:
-                mode = "Start"
-            elif self.proto_config["mode"] == SIReader.M_FINISH:
-                mode = "Finsih"
-            elif self.proto_config["mode"] == SIReader.M_CLEAR_OLD:
-                mode = "Clear"
-            elif self.proto_config["mode"] == SIReader.M_CLEAR:
-                mode = "Clear"
-            elif self.proto_config["mode"] == SIReader.M_CHECK:
-                mode = "Check"
-            else:
-                mode = "???"
+            mode = SIReader._BACKUP_CSV_MODES.get(self.proto_config["mode"], "???")
 
         if filename is None:
             filename = codestr + "_" + mode + "_" + str(serno) + ".csv"
-        with open(filename, "w", newline="") as csvfile:
+        # a large write buffer writes even big backups with a few syscalls
+        with open(filename, "w", newline="", buffering=1 << 20) as csvfile:
             csvwriter = csv.writer(
                 csvfile, delimiter=";", quotechar='"', quoting=csv.QUOTE_MINIMAL
             )
@@ -867,55 +1039,69 @@ class SIReader(SIConstants):
                 "SIAC is gate mode",
                 "",
             ]
-            days = ["Su", "Mo", "Tu", "We", "Th", "Fr", "Sa"]
+            # indexed by datetime.weekday(), Mon = 0
+            days = ("Mo", "Tu", "We", "Th", "Fr", "Sa", "Su")
             csvwriter.writerow(header)
             if readtime is None:
                 readtime = datetime.now()
             readtimestr = readtime.isoformat(timespec="seconds", sep=" ")
 
-            ii = 1
-            for punchdata in data:
+            # The rows are formatted directly instead of through csv.writer.
+            # The fixed fields never need quoting, the others are checked
+            # and a row that would need quoting is handed to csv.writer.
+            def needs_quoting(s):
+                return any(c in s for c in ';"\r\n')
+
+            fast = not (needs_quoting(readtimestr) or needs_quoting(codestr + mode))
+            line = "%s;" + readtimestr + ";%s;%s;;;" + codestr.replace("%", "%%")
+            line += ";%s;%s;" + mode.replace("%", "%%") + ";0;1;;;;;;\r\n"
+
+            lines = []
+            for ii, punchdata in enumerate(data, 1):
                 date = punchdata[0]
-                if date.microsecond == 0:
-                    # Make sure microseconds are always printed
-                    date.replace(microsecond=1)
                 cardno = punchdata[1]
                 err = punchdata[2]
-                datestr = date.isoformat(sep="$")[0:23]
+                # milliseconds are always printed, also for whole seconds
+                datestr = date.isoformat(sep="$", timespec="milliseconds")
                 datestr = datestr.replace("$", "   ")
 
                 if err == "":
                     # No error, normal case
-                    dayno = int(date.strftime("%w"))  # Day of week, Sun = 0
-                    dayname = days[dayno]
+                    dayname = days[date.weekday()]
                     timestr = datestr[13:]
                 else:
                     # Error
                     datestr = datestr[0:13] + err
                     dayname = ""
                     timestr = "00:00:00"
-                row = [
-                    ii,
-                    readtimestr,
-                    cardno,
-                    datestr,
-                    "",
-                    "",
-                    codestr,
-                    dayname,
-                    timestr,
-                    mode,
-                    "0",
-                    "1",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                ]
-                csvwriter.writerow(row)
-                ii += 1
+                if fast and not (err and needs_quoting(err)):
+                    lines.append(line % (ii, cardno, datestr, dayname, timestr))
+                    continue
+                csvfile.writelines(lines)
+                lines.clear()
+                csvwriter.writerow(
+                    (
+                        ii,
+                        readtimestr,
+                        cardno,
+                        datestr,
+                        "",
+                        "",
+                        codestr,
+                        dayname,
+                        timestr,
+                        mode,
+                        "0",
+                        "1",
+                        "",
+                        "",
+                        "",
+                        "",
+                        "",
+                        "",
+                    )
+                )
+            csvfile.writelines(lines)
         return filename
 
     def erase_backup(self):
@@ -928,8 +1114,16 @@ class SIReader(SIConstants):
 
     def disconnect(self):
         """Close the serial port an disconnect from the station."""
+        self.flush_log()
         self._serial.close()
 
+    def flush_log(self):
+        """Write the frames still buffered for the logfile to the file,
+        e.g. after reading the backup memory."""
+        if self._logger:
+            for handler in self._logger.handlers:
+                handler.flush()
+
     def reconnect(self):
         """Close the serial port and reopen again."""
         self.disconnect()
@@ -945,6 +1139,9 @@ class SIReader(SIConstants):
         except (SerialException, OSError):
             raise SIReaderException("Could not open port '%s'" % port)
 
+        if self._low_latency and sys.platform.startswith("linux"):
+            self._set_low_latency()
+
         # flush possibly available input
         try:
             self.flush()
@@ -980,6 +1177,24 @@ class SIReader(SIConstants):
         self._update_proto_config()
         self.name = self._serial.name
 
+    def _set_low_latency(self):
+        """Reduce the latency of the serial port on Linux. This is best effort,
+        the port works without it, only with longer round trips per command."""
+        try:
+            # sets ASYNC_LOW_LATENCY with the TIOCSSERIAL ioctl
+            self._serial.set_low_latency_mode(True)
+            return
+        except (AttributeError, ValueError, OSError):
+            pass
+
+        # FTDI based adapters hold back data for the latency timer (16 ms by default)
+        tty = os.path.basename(os.path.realpath(self._serial.port))
+        try:
+            with open("/sys/bus/usb-serial/devices/%s/latency_timer" % tty, "w") as f:
+                f.write("1")
+        except OSError:
+            pass
+
     def _update_proto_config(self):
         self.proto_config = {}
         if self._noconnect:
@@ -993,16 +1208,15 @@ class SIReader(SIConstants):
             self._station_code = 0
         else:
             # Read protocol configuration
-            sysval = self._send_command(SIReader.C_GET_SYS_VAL, b"\x00\x80")[1]
-            config_byte = byte2int(
-                SIReader._extract_sysval(sysval, SIReader.O_PROTO, 1)
-            )
+            self.refresh_sysval()
+            sysval = self.sysval
+            config_byte = sysval[SIReader.O_PROTO[0] + 1]
             self.proto_config["ext_proto"] = config_byte & (1 << 0) != 0
             self.proto_config["auto_send"] = config_byte & (1 << 1) != 0
             self.proto_config["handshake"] = config_byte & (1 << 2) != 0
             self.proto_config["pw_access"] = config_byte & (1 << 4) != 0
             self.proto_config["punch_read"] = config_byte & (1 << 7) != 0
-            mode_byte = byte2int(SIReader._extract_sysval(sysval, SIReader.O_MODE, 1))
+            mode_byte = sysval[SIReader.O_MODE[0] + 1]
             self.proto_config["mode"] = mode_byte
             serno = SIReader._to_int(
                 SIReader._extract_sysval(sysval, SIReader.O_SERIAL_NO, 4)
@@ -1014,12 +1228,14 @@ class SIReader(SIConstants):
 
     def _set_proto_config(self, config):
         try:
-            config_byte = int2byte(
-                (config["ext_proto"] << 0)
-                | (config["auto_send"] << 1)
-                | (config["handshake"] << 2)
-                | (config["pw_access"] << 4)
-                | (config["punch_read"] << 7)
+            config_byte = bytes(
+                (
+                    (config["ext_proto"] << 0)
+                    | (config["auto_send"] << 1)
+                    | (config["handshake"] << 2)
+                    | (config["pw_access"] << 4)
+                    | (config["punch_read"] << 7),
+                )
             )
             self._send_command(SIReader.C_SET_SYS_VAL, SIReader.O_PROTO + config_byte)
         finally:
@@ -1027,20 +1243,24 @@ class SIReader(SIConstants):
 
     def __del__(self):
         """
-        Closes the serial connection and log file (if open) when the object is deleted.
+        Closes the serial connection when the object is deleted.
         """
         if self._serial is not None:
             self._serial.close()
-        if self._logfile is not None:
-            self._logfile.close()
+
+    @staticmethod
+    def _mode_name(mode):
+        """Return the name of a station operating mode, or its hex value if unknown."""
+        if mode < len(SIReader._MODE_NAMES):
+            mode_str = SIReader._MODE_NAMES[mode]
+            if mode_str is not None:
+                return mode_str
+        return f"0x{mode:02x}"
 
     @staticmethod
     def _to_int(s):
-        """Computes the integer value of a raw byte string."""
-        value = 0
-        for offset, c in enumerate(iterbytes(s[::-1])):
-            value += c << offset * 8
-        return value
+        """Computes the integer value of a raw byte string (MSB first)."""
+        return int.from_bytes(s, "big")
 
     @staticmethod
     def _to_str(i, len):
@@ -1049,63 +1269,53 @@ class SIReader(SIConstants):
         @param len: Length of the return value. If i does not fit OverflowError is raised.
         @return:    string representation of i (MSB first)
         """
-        if PY3:
-            return i.to_bytes(len, "big")
-        if i >> len * 8 != 0:
-            raise OverflowError("%i too big to convert to %i bytes" % (i, len))
-        string = ""
-        for offset in range(len - 1, -1, -1):
-            string += int2byte((i >> offset * 8) & 0xFF)
-        return string
+        return i.to_bytes(len, "big")
 
     @staticmethod
     def _crc(s):
         """Compute the crc checksum of value. This implementation is
         a reimplementation of the Java function in the SI Programmers
-        manual examples."""
-
-        def twochars(s):
-            """generator that splits a string into parts of two chars"""
-            if len(s) == 0:
-                # immediately stop on empty string
-                return
-
-            # add 0 to the string and make it even length
-            if len(s) % 2 == 0:
-                s += b"\x00\x00"
-            else:
-                s += b"\x00"
-            for i in range(0, len(s), 2):
-                yield s[i : i + 2]
+        manual examples, using lookup tables to shift in a whole 16 bit
+        word per step instead of a single bit."""
 
         if len(s) < 1:
-            # return value for 1 or no data byte is 0
+            # return value for no data byte is 0
             return b"\x00\x00"
+        if len(s) < 3:
+            # the first word is the initial value, nothing to shift in
+            return SIReader._to_str(SIReader._to_int(s), 2)
+
+        # local names for the tables keep the lookups out of the global dict
+        table_hi = _CRC16_TABLE_HI
+        table_lo = _CRC16_TABLE
+
+        if len(s) <= 8:
+            # Short frames like most commands: indexing the bytes directly is
+            # cheaper than padding the string and unpacking it with struct.
+            n = len(s)
+            crc = (s[0] << 8) | s[1]
+            for i in range(2, n - 1, 2):
+                val = (s[i] << 8) | s[i + 1]
+                crc = val ^ table_hi[crc >> 8] ^ table_lo[crc & 0xFF]
+            # the zero padding: a low byte for an odd length, a whole word else
+            if n % 2:
+                crc = (s[-1] << 8) ^ table_hi[crc >> 8] ^ table_lo[crc & 0xFF]
+            else:
+                crc = table_hi[crc >> 8] ^ table_lo[crc & 0xFF]
+            return SIReader._to_str(crc, 2)
 
-        crc = SIReader._to_int(s[0:2])
-
-        for c in twochars(s[2:]):
-            val = SIReader._to_int(c)
-
-            for j in range(16):
-                if (crc & SIReader.CRC_BITF) != 0:
-                    crc <<= 1
-
-                    if (val & SIReader.CRC_BITF) != 0:
-                        crc += 1  # rotate carry
-
-                    crc ^= SIReader.CRC_POLYNOM
-                else:
-                    crc <<= 1
-
-                    if (val & SIReader.CRC_BITF) != 0:
-                        crc += 1  # rotate carry
+        # add 0 to the string and make it even length
+        if len(s) % 2 == 0:
+            s += b"\x00\x00"
+        else:
+            s += b"\x00"
 
-                val <<= 1
+        words = struct.unpack(">%iH" % (len(s) // 2), s)
+        crc = words[0]
+        for val in words[1:]:
+            crc = val ^ table_hi[crc >> 8] ^ table_lo[crc & 0xFF]
 
-        # truncate to 16 bit and convert to char
-        crc &= 0xFFFF
-        return int2byte(crc >> 8) + int2byte(crc & 0xFF)
+        return SIReader._to_str(crc, 2)
 
     @staticmethod
     def _crc_check(s, crc):
@@ -1135,18 +1345,18 @@ class SIReader(SIConstants):
         (500'000 = 0x07A120 > 0x04FFFF = 465'535 = highest technically possible value on a SI5)
         """
 
-        if number[0:1] != b"\x00":
+        if number[0] != 0:
             raise SIReaderException("Unknown card series")
 
-        nr = SIReader._to_int(number[1:4])
+        nr = int.from_bytes(number[1:4], "big")
         if nr < 500000:
             # SI5 card
-            ret = SIReader._to_int(number[2:4])
-            if byte2int(number[1]) < 2:
+            ret = int.from_bytes(number[2:4], "big")
+            if number[1] < 2:
                 # Card series 0 and 1 do not have the 0/1 printed on the card
                 return ret
             else:
-                return byte2int(number[1]) * 100000 + ret
+                return number[1] * 100000 + ret
         else:
             # SI6/8/9
             return nr
@@ -1159,13 +1369,25 @@ class SIReader(SIConstants):
         if raw_time == SIReader.TIME_RESET:
             return None
 
+        return SIReader._decode_punchtime(
+            int.from_bytes(raw_time, "big"), raw_ptd, reftime
+        )
+
+    @staticmethod
+    def _decode_punchtime(punchtime, raw_ptd=None, reftime=None):
+        """Decodes a punch time given as seconds after midnight/noon into a
+        datetime object, see _decode_time."""
+
         if reftime is None:
             # add two hours as a safety marging for cases where the
             # machine time runs a bit behind the station's time.
             reftime = datetime.now() + timedelta(hours=2)
 
+        # The times are computed in integer seconds, only the result is built
+        # as a datetime: midnight of the punch day plus the seconds of the punch.
         # punchtime is in the range 0h-12h!
-        punchtime = timedelta(seconds=SIReader._to_int(raw_time))
+        ref_ordinal = reftime.toordinal()
+        ref_secs = reftime.hour * 3600 + reftime.minute * 60 + reftime.second
 
         # Documentation of the PTD byte from SportIdent
         # bit 0 - am/pm
@@ -1176,12 +1398,12 @@ class SIReader(SIConstants):
         # week counter is not used!
 
         if raw_ptd is not None:
-            ptd = byte2int(raw_ptd)
+            ptd = raw_ptd
 
             # get info about AM(0) or PM(1)
             # and adjust punchtime in case of PM
             if (ptd & 0b00000001) == 0b1:
-                punchtime = punchtime + timedelta(hours=12)
+                punchtime += 12 * 3600
 
             # extract day of week and convert to Mon = 0, Tue = 1 ... as
             # datetime.weekday has Mon = 0, Sun = 6 the modulo operation
@@ -1190,43 +1412,42 @@ class SIReader(SIConstants):
 
             # subtract a whole week if the dow week is the same but the punchtime
             # is later on the same day
-            if reftime.weekday() == dow and punchtime > timedelta(
-                hours=reftime.hour, minutes=reftime.minute, seconds=reftime.second
-            ):
-                reftime -= timedelta(days=7)
+            ref_dow = reftime.weekday()
+            if ref_dow == dow and punchtime > ref_secs:
+                days_back = 7
             else:
                 # adjust reftime according to weekday information
-                reftime -= timedelta(days=(reftime.weekday() - dow) % 7)
+                days_back = (ref_dow - dow) % 7
 
-            ref_day = reftime.replace(
-                hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+            return datetime.fromordinal(ref_ordinal - days_back) + timedelta(
+                seconds=punchtime
             )
-            return ref_day + punchtime
 
         # No PTD byte available, we have to rely on guessing the closest 12h time
 
-        ref_day = reftime.replace(
-            hour=0, minute=0, second=0, microsecond=0, tzinfo=None
-        )
-        ref_hour = reftime - ref_day
-        t_noon = timedelta(hours=12)
+        ref_day = datetime.fromordinal(ref_ordinal)
+        # compare in microseconds, the punch is only later than the reference
+        # if it is later than the reference including its fraction of a second
+        ref_hour = ref_secs * 1000000 + reftime.microsecond
+        punch_us = punchtime * 1000000
+        t_noon = 12 * 3600 * 1000000
 
         if ref_hour < t_noon:
             # reference time is before noon
-            if punchtime < ref_hour:
+            if punch_us < ref_hour:
                 # t is between 00:00 and t_ref
-                return ref_day + punchtime
+                return ref_day + timedelta(seconds=punchtime)
             else:
                 # t is afternoon the day before
-                return ref_day - t_noon + punchtime
+                return ref_day + timedelta(seconds=punchtime - 12 * 3600)
         else:
             # reference is after noon
-            if punchtime < ref_hour - t_noon:
+            if punch_us < ref_hour - t_noon:
                 # t is between noon and t_ref
-                return ref_day + t_noon + punchtime
+                return ref_day + timedelta(seconds=punchtime + 12 * 3600)
             else:
                 # t is in the late morning
-                return ref_day + punchtime
+                return ref_day + timedelta(seconds=punchtime)
 
     @staticmethod
     def _decode_station_code(raw_code, raw_ptd=None):
@@ -1240,119 +1461,194 @@ class SIReader(SIConstants):
             return raw_code
 
     @staticmethod
-    def _append_punch(list, station, timedata, ptd, reftime):
-        time = SIReader._decode_time(timedata, ptd, reftime)
-        if time is not None:
-            list.append((station, time))
+    def _decode_carddata(data, card_type, reftime=None):
+        """Decodes a data record read from an SI Card.
+        @param card_type: one of the CardType members
+        """
+        if reftime is None:
+            # the times are decoded relative to the current time, which
+            # changes between calls, so only fixed reftimes are cached
+            return SIReader._parse_carddata(data, card_type, reftime)
+
+        ret = _parse_carddata_cached(bytes(data), card_type, reftime)
+        # the cached dict is shared between calls, return a copy of it
+        return dict(ret, punches=list(ret["punches"]))
 
     @staticmethod
-    def _decode_carddata(data, card_type, reftime=None):
-        """Decodes a data record read from an SI Card."""
+    def _parse_carddata(data, card_type, reftime):
+
+        if reftime is None:
+            # same as in _decode_time, but only once for all times on the card
+            reftime = datetime.now() + timedelta(hours=2)
 
         ret = {}
         card = SIReader.CARD[card_type]
 
-        # the slicing of data is necessary for Python 3 to get a bytes object instead
-        # of an int
         ret["card_number"] = SIReader._decode_cardnr(
-            b"\x00"
-            + data[card["CN2"] : card["CN2"] + 1]
-            + data[card["CN1"] : card["CN1"] + 1]
-            + data[card["CN0"] : card["CN0"] + 1]
+            bytes((0, data[card.CN2], data[card.CN1], data[card.CN0]))
         )
 
-        time_day = data[card["STD"]] if card["STD"] else None
-        code = data[card["SN"]] if card["SN"] is not None else None
+        time_day = data[card.STD] if card.STD else None
+        code = data[card.SN] if card.SN is not None else None
         ret["start"] = SIReader._decode_time(
-            data[card["ST"] : card["ST"] + 2], time_day, reftime
+            data[card.ST : card.ST + 2], time_day, reftime
         )
         ret["start_code"] = SIReader._decode_station_code(code, time_day)
 
-        time_day = data[card["FTD"]] if card["FTD"] else None
-        code = data[card["FN"]] if card["FN"] is not None else None
+        time_day = data[card.FTD] if card.FTD else None
+        code = data[card.FN] if card.FN is not None else None
         ret["finish"] = SIReader._decode_time(
-            data[card["FT"] : card["FT"] + 2], time_day, reftime
+            data[card.FT : card.FT + 2], time_day, reftime
         )
         ret["finish_code"] = SIReader._decode_station_code(code, time_day)
 
-        time_day = data[card["CTD"]] if card["CTD"] else None
-        code = data[card["CHN"]] if card["CHN"] is not None else None
+        time_day = data[card.CTD] if card.CTD else None
+        code = data[card.CHN] if card.CHN is not None else None
         ret["check"] = SIReader._decode_time(
-            data[card["CT"] : card["CT"] + 2], time_day, reftime
+            data[card.CT : card.CT + 2], time_day, reftime
         )
         ret["check_code"] = SIReader._decode_station_code(code, time_day)
 
-        if card["LT"] is not None:
-            time_day = data[card["LTD"]] if card["LTD"] else None
-            code = data[card["LN"]] if card["LN"] is not None else None
+        if card.LT is not None:
+            time_day = data[card.LTD] if card.LTD else None
+            code = data[card.LN] if card.LN is not None else None
             ret["clear"] = SIReader._decode_time(
-                data[card["LT"] : card["LT"] + 2], time_day, reftime
+                data[card.LT : card.LT + 2], time_day, reftime
             )
             ret["clear_code"] = SIReader._decode_station_code(code, time_day)
         else:
             ret["clear"] = None  # SI 5 and 9 cards don't store the clear time
             ret["clear_code"] = None
 
-        punch_count = byte2int(data[card["RC"] : card["RC"] + 1])
-        if card_type == "SI5":
+        punch_count = data[card.RC]
+        if card_type == CardType.SI5:
             # RC is the index of the next punch on SI5
             punch_count -= 1
 
-        if punch_count > card["PM"]:
-            punch_count = card["PM"]
+        if punch_count > card.PM:
+            punch_count = card.PM
 
-        ret["punches"] = []
-        p = 0
-        i = card["P1"]
-        while p < punch_count:
-            if card_type == "SI5" and i % 16 == 0:
-                # first byte of each block is reserved for punches 31-36
-                i += 1
-
-            ptd = data[i + card["PTD"]] if card["PTD"] is not None else None
-            cn = SIReader._decode_station_code(byte2int(data[i + card["CN"]]), time_day)
-            pt = data[i + card["PTH"] : i + card["PTL"] + 1]
-
-            SIReader._append_punch(ret["punches"], cn, pt, ptd, reftime)
+        # Collect the punch records into one contiguous block and decode it
+        # field by field with strided slices instead of record by record
+        pl = card.PL
+        if card_type == CardType.SI5:
+            # first byte of each block is reserved for punches 31-36
+            block = b"".join(
+                data[i + 1 : i + 16] for i in range(card.P1, len(data), 16)
+            )
+        else:
+            block = data[card.P1 :]
+        block = block[: max(punch_count, 0) * pl]
 
-            i += card["PL"]
-            p += 1
+        codes = block[card.CN :: pl]
+        if card.PTD is not None:
+            days = block[card.PTD :: pl]
+        else:
+            days = (None,) * len(codes)
+        # punch times are two bytes, combined from the PTH and PTL columns
+        # as integers without slicing each record
+        time_high = block[card.PTH :: pl]
+        time_low = block[card.PTL :: pl]
+        time_reset = int.from_bytes(SIReader.TIME_RESET, "big")
+
+        punches = ret["punches"] = []
+        decode_station_code = SIReader._decode_station_code
+        decode_punchtime = SIReader._decode_punchtime
+        for code, ptd, high, low in zip(codes, days, time_high, time_low):
+            punchtime = (high << 8) | low
+            if punchtime == time_reset:
+                continue
+            punches.append(
+                (
+                    decode_station_code(code, ptd),
+                    decode_punchtime(punchtime, ptd, reftime),
+                )
+            )
 
         return ret
 
+    @staticmethod
+    def _build_command(command, parameters, wakeup=True):
+        """Build the frame for a command to the station.
+        @param command:    command code, one of the SIReader.C_... constants
+        @param parameters: parameter bytes of the command
+        @param wakeup:     prepend the WAKEUP byte to the frame
+        @return:           the complete frame: [WAKEUP] STX command length parameters crc ETX
+        """
+        if type(parameters) is bytes:
+            # a bytearray can't be hashed to look it up
+            frame = _FIXED_FRAMES.get((command, parameters, wakeup))
+            if frame is not None:
+                return frame
+
+        # assemble the frame in a single buffer instead of concatenating its parts
+        frame = bytearray(SIReader.WAKEUP if wakeup else b"")
+        frame += SIReader.STX
+        start = len(frame)
+        frame += command
+        frame.append(len(parameters))
+        frame += parameters
+        frame += SIReader._crc(frame[start:])
+        frame += SIReader.ETX
+        return bytes(frame)
+
     def _send_command(self, command, parameters, **kw):
+        self._write_command(command, parameters, **kw)
+        return self._read_command()
+
+    def _write_command(self, command, parameters, check_empty=True, **kw):
+        """Send a command to the station without reading its reply.
+        @param check_empty: in debug mode raise if there is unread data in the
+                            input buffer, disable this to send a command while
+                            replies to previous commands are still pending.
+                            Every command must be paired with a _read_command
+                            of its reply, a desync is otherwise only detected
+                            by the frame checks in _read_command.
+        """
         try:
-            if self._serial.inWaiting() != 0:
+            # only checked in debug mode: inWaiting() costs a syscall per command
+            if check_empty and self._debug and self._serial.inWaiting() != 0:
                 raise SIReaderException(
                     "Input buffer must be empty before sending command."
                     + " Currently %s bytes in the input buffer."
                     % self._serial.inWaiting()
                 )
-            command_string = command + int2byte(len(parameters)) + parameters
-            crc = SIReader._crc(command_string)
-            cmd = SIReader.STX + command_string + crc + SIReader.ETX
-            if not kw.get("skipwakeup"):
-                cmd = SIReader.WAKEUP + cmd
+            cmd = SIReader._build_command(
+                command, parameters, wakeup=not kw.get("skipwakeup")
+            )
+            if command in SIReader._SYSVAL_CHANGING_COMMANDS:
+                self._sysval_dirty = True
             if self._debug:
                 print(
                     "==>> command '%s', parameters %s, crc %s"
                     % (
                         hexlify(command).decode("ascii"),
-                        " ".join(
-                            [hexlify(int2byte(c)).decode("ascii") for c in parameters]
-                        ),
-                        hexlify(crc).decode("ascii"),
+                        " ".join(["%02x" % c for c in parameters]),
+                        hexlify(cmd[-3:-1]).decode("ascii"),
                     )
                 )
             self._serial.write(cmd)
         except (SerialException, OSError) as msg:
             raise SIReaderException("Could not send command: %s" % msg)
 
-        if self._logfile:
-            self._logfile.write("s %s %s\n" % (datetime.now(), cmd))
-            self._logfile.flush()
-            os.fsync(self._logfile)
-        return self._read_command()
+        if self._logger:
+            self._logger.info("s %s %s", datetime.now(), cmd)
+
+    def _poll_input(self):
+        """Check without waiting if there is input from the station, with a single
+        select() call on the port's file descriptor.
+        @return: whether input is waiting, None if the port has no file
+                 descriptor to wait on (Windows) or is closed
+        """
+        if os.name != "posix":
+            # select() only takes sockets on Windows
+            return None
+        try:
+            fd = self._serial.fileno()
+        except (AttributeError, OSError, ValueError, SerialException):
+            # io.UnsupportedOperation is an OSError and a ValueError
+            return None
+        return bool(select.select((fd,), (), (), 0)[0])
 
     def _read_command(self, timeout=None):
         """Receive reply from station.
@@ -1366,6 +1662,14 @@ class SIReader(SIConstants):
         """
 
         try:
+            # Polling without timeout: check for input with one select() call
+            # instead of changing the port's timeout twice for an empty read.
+            ready = self._poll_input() if timeout == 0 else None
+            if ready is False:
+                raise SIReaderTimeout("No data available")
+            if ready:
+                # the data is already waiting, keep the port's timeout
+                timeout = None
             if timeout != None:
                 old_timeout = self._serial.timeout
                 self._serial.timeout = timeout
@@ -1384,25 +1688,31 @@ class SIReader(SIConstants):
                 raise SIReaderException("Invalid command or parameter.")
             elif char != SIReader.STX:
                 self._serial.flushInput()
-                raise SIReaderException("Invalid start byte %s" % hex(byte2int(char)))
-
-            # Read command, length, data, crc, ETX
-            cmd = self._serial.read()
-            length = self._serial.read()
-            station = self._serial.read(2)
-            self._station_code = SIReader._to_int(station)
-            data = self._serial.read(byte2int(length) - 2)
-            crc = self._serial.read(2)
-            etx = self._serial.read()
+                raise SIReaderException("Invalid start byte %s" % hex(char[0]))
+
+            # Read command and length, then the rest of the frame in a single call.
+            # The length byte covers station code and data, crc and ETX follow.
+            header = self._serial.read(2)
+            if len(header) < 2:
+                raise SIReaderTimeout("Incomplete reply")
+            cmd = header[0:1]
+            length = header[1:2]
+            n = header[1]
+            frame = self._serial.read(n + 3)
+            station = frame[0:2]
+            self._station_code = int.from_bytes(station, "big")
+            data = frame[2:n]
+            crc = frame[n : n + 2]
+            etx = frame[n + 2 : n + 3]
 
             if self._debug:
                 print(
                     "<<== command '%s', len %i, station %s, data %s, crc %s, etx %s"
                     % (
                         hexlify(cmd).decode("ascii"),
-                        byte2int(length),
+                        length[0],
                         hexlify(station).decode("ascii"),
-                        " ".join([hexlify(int2byte(c)).decode("ascii") for c in data]),
+                        " ".join(["%02x" % c for c in data]),
                         hexlify(crc).decode("ascii"),
                         hexlify(etx).decode("ascii"),
                     )
@@ -1410,16 +1720,11 @@ class SIReader(SIConstants):
 
             if etx != SIReader.ETX:
                 raise SIReaderException("No ETX byte received.")
-            if not SIReader._crc_check(cmd + length + station + data, crc):
+            if not SIReader._crc_check(header + frame[:n], crc):
                 raise SIReaderException("CRC check failed")
 
-            if self._logfile:
-                self._logfile.write(
-                    "r %s %s\n"
-                    % (datetime.now(), char + cmd + length + station + data + crc + etx)
-                )
-                self._logfile.flush()
-                os.fsync(self._logfile)
+            if self._logger:
+                self._logger.info("r %s %s", datetime.now(), char + header + frame)
 
         except (SerialException, OSError) as msg:
             raise SIReaderException("Error reading command: %s" % msg)
@@ -1436,5 +1741,31 @@ class SIReader(SIConstants):
         """
         # Has to add 1 to the offset since the first byte of the data is for some reason
         # not included in the offset constants (this byte always seems to be 0)
-        start = byte2int(offset) + 1
+        start = offset[0] + 1
         return bytearr[start : start + length]
+
+
+_FIXED_FRAMES.update(
+    (
+        (command, parameters, wakeup),
+        SIReader._build_command(command, parameters, wakeup),
+    )
+    for command, parameters in (
+        (SIReader.C_GET_SYS_VAL, b"\x00\x80"),
+        (SIReader.C_GET_TIME, b""),
+        (SIReader.C_GET_SI5, b""),
+        (SIReader.C_GET_SI6, SIReader.P_SI6_CB),
+        (SIReader.C_GET_SI9, SIReader.P_SI6_CB),
+        # the single blocks of SI8/SI9/pCard cards
+        *((SIReader.C_GET_SI9, bytes((b,))) for b in range(8)),
+        (SIReader.C_SET_MS, SIReader.P_MS_DIRECT),
+        (SIReader.C_SET_MS, SIReader.P_MS_INDIRECT),
+        (SIReader.C_ERASE_BACKUP, b""),
+        (SIReader.C_OFF, b""),
+    )
+    for wakeup in (True, False)
+)
+
+# Card data decoded relative to a fixed reftime, for cards that are read
+# repeatedly and for replayed data
+_parse_carddata_cached = lru_cache(maxsize=256)(SIReader._parse_carddata)
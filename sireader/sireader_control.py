@@ -18,18 +18,23 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from .compat import int2byte
+import struct
+
 from .exceptions import SIReaderException, SIReaderTimeout
 from .sireader import SIReader
 
 __all__ = ["SIReaderControl"]
 
+# Transmitted punch record: card number at T_CN, punch time at T_TIME and
+# the 3 byte backup memory offset at T_OFFSET, split into a high byte and a word
+_TRANS_REC = struct.Struct(">4sx2sxBH")
+
 
 class SIReaderControl(SIReader):
     """Class for reading an SI Station configured as control in autosend mode."""
 
     def __init__(self, *args, **kwargs):
-        super(type(self), self).__init__(*args, **kwargs)
+        super().__init__(*args, **kwargs)
         self._next_offset = None
 
     def poll_punch(self, timeout=0):
@@ -56,27 +61,18 @@ class SIReaderControl(SIReader):
             except SIReaderTimeout:
                 break
 
-            if c[0] == SIReader.C_TRANS_REC:
-                cur_offset = SIReader._to_int(
-                    c[1][SIReader.T_OFFSET : SIReader.T_OFFSET + 3]
-                )
-                if self._next_offset is not None:
-                    while self._next_offset < cur_offset:
-                        # recover lost punches
-                        punches.append(self._read_punch(self._next_offset))
-                        self._next_offset += SIReader.REC_LEN
-
-                self._next_offset = cur_offset + SIReader.REC_LEN
-            punches.append(
-                (
-                    self._decode_cardnr(c[1][SIReader.T_CN : SIReader.T_CN + 4]),
-                    self._decode_time(c[1][SIReader.T_TIME : SIReader.T_TIME + 2]),
-                )
-            )
-        else:
-            raise SIReaderException(
-                "Unexpected command %s received" % hex(byte2int(c[0]))
-            )
+            if c[0] != SIReader.C_TRANS_REC:
+                raise SIReaderException("Unexpected command %s received" % hex(c[0][0]))
+
+            cardnr, punchtime, offset_hi, offset_lo = _TRANS_REC.unpack_from(c[1])
+            cur_offset = (offset_hi << 16) | offset_lo
+            if self._next_offset is not None and self._next_offset < cur_offset:
+                # recover lost punches, the number of records is rounded up
+                missing = -((self._next_offset - cur_offset) // SIReader.REC_LEN)
+                punches.extend(self._read_punch_range(self._next_offset, missing))
+
+            self._next_offset = cur_offset + SIReader.REC_LEN
+            punches.append((self._decode_cardnr(cardnr), self._decode_time(punchtime)))
 
         return punches
 
@@ -85,11 +81,32 @@ class SIReaderControl(SIReader):
         @param offset: Position in the backup memory to read
         @warning:      Only supports firmwares 5.55+ older firmwares have an incompatible record format!
         """
-        c = self._send_command(
-            SIReader.C_GET_BACKUP,
-            SIReader._to_str(offset, 3) + int2byte(SIReader.REC_LEN),
-        )
-        return (
-            self._decode_cardnr(b"\x00" + c[1][SIReader.BC_CN : SIReader.BC_CN + 3]),
-            self._decode_time(c[1][SIReader.BC_TIME : SIReader.BC_TIME + 2]),
-        )
+        return self._read_punch_range(offset, 1)[0]
+
+    def _read_punch_range(self, offset, count):
+        """Reads consecutive punches from the SI Stations backup memory, with as
+        many records per command as fit into the 0x80 bytes of a backup read.
+        @param offset: Position in the backup memory of the first punch
+        @param count:  Number of punches to read
+        @warning:      Only supports firmwares 5.55+ older firmwares have an incompatible record format!
+        """
+        punches = []
+        per_command = 0x80 // SIReader.REC_LEN
+        while count > 0:
+            n = min(count, per_command)
+            # 3 byte address followed by the byte count, packed as one integer
+            params = ((offset << 8) | (n * SIReader.REC_LEN)).to_bytes(4, "big")
+            c = self._send_command(SIReader.C_GET_BACKUP, params)
+            data = c[1]
+            for rec in range(0, n * SIReader.REC_LEN, SIReader.REC_LEN):
+                cn = rec + SIReader.BC_CN
+                time = rec + SIReader.BC_TIME
+                punches.append(
+                    (
+                        self._decode_cardnr(b"\x00" + data[cn : cn + 3]),
+                        self._decode_time(data[time : time + 2]),
+                    )
+                )
+            offset += n * SIReader.REC_LEN
+            count -= n
+        return punches
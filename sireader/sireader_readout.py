@@ -20,19 +20,33 @@
 
 from serial.serialutil import SerialException
 
-from .compat import int2byte
 from .exceptions import SIReaderCardChanged, SIReaderException
+from .si_constants import CardType
 from .sireader import SIReader
 
 __all__ = "SIReaderReadout"
 
+# block numbers as parameters of C_GET_SI9, built once instead of for every read
+_BLOCK_NUMBERS = tuple(bytes((b,)) for b in range(256))
+
+# card types detected with C_SI9_DET, keyed on the card number in millions
+_SI9_DET_CARD_TYPES = {
+    1: CardType.SI9,  # 1'000'000-1'999'999
+    2: CardType.SI8,  # 2'000'000-2'999'999
+    4: CardType.pCard,  # 4'000'000-4'999'999
+    # 6: tCard, don't have one for testing
+    7: CardType.SI10,  # SI10: 7'000'000-7'999'999
+    8: CardType.SI10,  # SIAC1: 8'000'000-8'999'999
+    9: CardType.SI10,  # SI11: 9'000'000-9'999'999
+}
+
 
 class SIReaderReadout(SIReader):
     """Class for 'classic' SI card readout. Reads out the whole card. If you don't know
     about other readout modes (control mode) you probably want this class."""
 
     def __init__(self, *args, **kwargs):
-        super(type(self), self).__init__(*args, **kwargs)
+        super().__init__(*args, **kwargs)
 
         self.sicard = None
         self.cardtype = None
@@ -48,7 +62,7 @@ class SIReaderReadout(SIReader):
                 "mode. Switch mode first"
             )
 
-        if not self.proto_config["mode"] == SIReader.M_READOUT:
+        if self.proto_config["mode"] != SIReader.M_READOUT:
             raise SIReaderException(
                 "Station must be in 'Read SI cards' operating mode! Change operating mode first."
             )
@@ -57,19 +71,26 @@ class SIReaderReadout(SIReader):
             return False
 
         oldcard = self.sicard
-        while self._serial.inWaiting() > 0:
+        while True:
             # _read_command does the actual parsing of the command
-            # if it's an insert or remove event
+            # if it's an insert or remove event. The data is already waiting,
+            # so the port timeout is kept instead of reconfiguring it for each
+            # command.
             try:
-                self._read_command(timeout=0)
+                self._read_command()
             except SIReaderCardChanged:
                 pass
+            if self._serial.inWaiting() == 0:
+                break
 
-        return not oldcard == self.sicard
+        return oldcard != self.sicard
 
-    def read_sicard(self, reftime=None):
+    def read_sicard(self, reftime=None, pipeline=False):
         """Reads out the SI Card currently inserted into the station. The card must be
-        detected with poll_sicard before."""
+        detected with poll_sicard before.
+        @param pipeline: send the read requests for all blocks of SI8/SI9/pCard cards
+                         before reading the replies, instead of waiting for each
+                         reply before the next request."""
 
         if not self.proto_config["ext_proto"]:
             raise SIReaderException(
@@ -77,27 +98,37 @@ class SIReaderReadout(SIReader):
                 "mode. Switch mode first"
             )
 
-        if not self.proto_config["mode"] == SIReader.M_READOUT:
+        if self.proto_config["mode"] != SIReader.M_READOUT:
             raise SIReaderException(
                 "Station must be in 'Read SI cards' operating mode! Change operating mode first."
             )
 
-        if self.cardtype == "SI5":
-            raw_data = self._send_command(SIReader.C_GET_SI5, b"")[1]
-        elif self.cardtype == "SI6":
-            raw_data = self._send_command(SIReader.C_GET_SI6, SIReader.P_SI6_CB)[1][1:]
+        raw_data = bytearray()
+        if self.cardtype == CardType.SI5:
+            raw_data += self._send_command(SIReader.C_GET_SI5, b"")[1]
+        elif self.cardtype == CardType.SI6:
+            raw_data += self._send_command(SIReader.C_GET_SI6, SIReader.P_SI6_CB)[1][1:]
             raw_data += self._read_command()[1][1:]
             raw_data += self._read_command()[1][1:]
-        elif self.cardtype in ("SI8", "SI9", "pCard"):
-            raw_data = b""
-            for b in range(SIReader.CARD[self.cardtype]["BC"]):
-                raw_data += self._send_command(SIReader.C_GET_SI9, int2byte(b))[1][1:]
+        elif self.cardtype in (CardType.SI8, CardType.SI9, CardType.pCard):
+            blocks = range(SIReader.CARD[self.cardtype].BC)
+            if pipeline:
+                for b in blocks:
+                    self._write_command(
+                        SIReader.C_GET_SI9, _BLOCK_NUMBERS[b], check_empty=(b == 0)
+                    )
+                for b in blocks:
+                    raw_data += self._read_command()[1][1:]
+            else:
+                for b in blocks:
+                    reply = self._send_command(SIReader.C_GET_SI9, _BLOCK_NUMBERS[b])
+                    raw_data += reply[1][1:]
 
-        elif self.cardtype == "SI10":
+        elif self.cardtype == CardType.SI10:
             # Reading out SI10 cards block by block proved to be unreliable and slow
             # Thus reading with C_GET_SI9 and block number 8 = P_SI6_CB like SI6
             # cards
-            raw_data = self._send_command(SIReader.C_GET_SI9, SIReader.P_SI6_CB)[1][1:]
+            raw_data += self._send_command(SIReader.C_GET_SI9, SIReader.P_SI6_CB)[1][1:]
             raw_data += self._read_command()[1][1:]
             raw_data += self._read_command()[1][1:]
             raw_data += self._read_command()[1][1:]
@@ -105,7 +136,7 @@ class SIReaderReadout(SIReader):
         else:
             raise SIReaderException("No card in the device.")
 
-        return SIReader._decode_carddata(raw_data, self.cardtype, reftime)
+        return SIReader._decode_carddata(bytes(raw_data), self.cardtype, reftime)
 
     def ack_sicard(self):
         """Sends an ACK signal to the SI Station. After receiving an ACK signal
@@ -119,36 +150,44 @@ class SIReaderReadout(SIReader):
         """Reads commands from the station. As a station in readout mode can send a
         card inserted or card removed event at any time we have to intercept these events
         here."""
-        cmd, data = super(type(self), self)._read_command(timeout)
+        cmd, data = super()._read_command(timeout)
 
         # check if a card was inserted or removed
-        if cmd == SIReader.C_SI_REM:
-            self.sicard = None
-            self.cardtype = None
-            raise SIReaderCardChanged("SI-Card removed during command.")
-        elif cmd == SIReader.C_SI5_DET:
-            self.sicard = self._decode_cardnr(data)
-            self.cardtype = "SI5"
-            raise SIReaderCardChanged("SI-Card inserted during command.")
-        elif cmd == SIReader.C_SI6_DET:
-            self.sicard = self._to_int(data)
-            self.cardtype = "SI6"
-            raise SIReaderCardChanged("SI-Card inserted during command.")
-        elif cmd == SIReader.C_SI9_DET:
-            # SI 9 sends corrupt first byte (insignificant)
-            self.sicard = self._to_int(data[1:])
-            if self.sicard >= 2000000 and self.sicard <= 2999999:
-                self.cardtype = "SI8"
-            elif self.sicard >= 1000000 and self.sicard <= 1999999:
-                self.cardtype = "SI9"
-            elif self.sicard >= 4000000 and self.sicard <= 4999999:
-                self.cardtype = "pCard"
-            #            elif self.sicard >= 6000000 and self.sicard <= 6999999:  # tCard, don't have one for testing
-            #                self.cardtype = 'SI9'
-            elif self.sicard >= 7000000 and self.sicard <= 9999999:
-                self.cardtype = "SI10"
-            else:
-                raise SIReaderException("Unknown cardtype!")
-            raise SIReaderCardChanged("SI-Card inserted during command.")
+        handler = SIReaderReadout._CARD_EVENT_HANDLERS.get(cmd)
+        if handler is not None:
+            handler(self, data)
 
         return (cmd, data)
+
+    def _on_si_removed(self, data):
+        self.sicard = None
+        self.cardtype = None
+        raise SIReaderCardChanged("SI-Card removed during command.")
+
+    def _on_si5_detected(self, data):
+        self.sicard = self._decode_cardnr(data)
+        self.cardtype = CardType.SI5
+        raise SIReaderCardChanged("SI-Card inserted during command.")
+
+    def _on_si6_detected(self, data):
+        self.sicard = self._to_int(data)
+        self.cardtype = CardType.SI6
+        raise SIReaderCardChanged("SI-Card inserted during command.")
+
+    def _on_si9_detected(self, data):
+        # SI 9 sends corrupt first byte (insignificant)
+        self.sicard = self._to_int(data[1:])
+        self.cardtype = _SI9_DET_CARD_TYPES.get(self.sicard // 1000000)
+        if self.cardtype is None:
+            raise SIReaderException("Unknown cardtype!")
+        raise SIReaderCardChanged("SI-Card inserted during command.")
+
+    # handlers of the card inserted and removed events, keyed on the command code.
+    # They are plain functions and not bound methods, so the instances don't
+    # reference themselves.
+    _CARD_EVENT_HANDLERS = {
+        SIReader.C_SI_REM: _on_si_removed,
+        SIReader.C_SI5_DET: _on_si5_detected,
+        SIReader.C_SI6_DET: _on_si6_detected,
+        SIReader.C_SI9_DET: _on_si9_detected,
+    }
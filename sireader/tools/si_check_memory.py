@@ -26,7 +26,7 @@ si_check_memory.py COM4
 
 import sys
 
-from sireader2 import SIReader, SIReaderException, byte2int
+from sireader2 import SIReader, SIReaderException
 
 try:
     if len(sys.argv) > 1:
@@ -102,8 +102,8 @@ while True:
             print("Memory size: " + str(mem_size) + " kB")
             # Check backup pointer
             sval = si.sysval
-            offs1 = byte2int(si.O_BACKUP_PTR_HI) + 1
-            offs2 = byte2int(si.O_BACKUP_PTR_LO) + 1
+            offs1 = si.O_BACKUP_PTR_HI[0] + 1
+            offs2 = si.O_BACKUP_PTR_LO[0] + 1
             end_ptr = SIReader._to_int(
                 sval[offs1 : offs1 + 2] + sval[offs2 : offs2 + 2]
             )
@@ -56,7 +56,7 @@ card_data = si.read_sicard()
 si.ack_sicard()
 
 print("Number: " + str(card_number))
-print("Type:   " + card_type)
+print("Type:   " + str(card_type))
 print("Data:")
 for key, val in card_data.items():
     if key == "punches":
@@ -0,0 +1,10 @@
+from sireader import SIReader
+
+
+def test_build_command_bytearray_parameters():
+    # bytearray parameters can't be looked up in the table of prebuilt frames
+    for parameters in (b"\x00\x80", b"\x00\x01\x00\x80", b"\x01"):
+        expected = SIReader._build_command(SIReader.C_GET_SYS_VAL, parameters)
+        frame = SIReader._build_command(SIReader.C_GET_SYS_VAL, bytearray(parameters))
+        assert frame == expected
+        assert type(frame) is bytes